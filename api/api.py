@@ -8,39 +8,80 @@ Author: Ridwan Oladipo, MD | AI Specialist
 # ------------------------------------------------------------------------------
 # Imports
 # ------------------------------------------------------------------------------
+import asyncio
 from datetime import datetime
+import functools
+import hashlib
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import os
+import queue
 import time
 import traceback
 from typing import Any, Dict, List, Optional
 
 import uvicorn
-from fastapi import FastAPI, HTTPException, Request, status
+from fastapi import FastAPI, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 from .ecg_api_helpers import initialize_data_service, data_service
+from .orjson_response import ORJSONResponse, dumps
 
 
 # ------------------------------------------------------------------------------
 # Logging
 # ------------------------------------------------------------------------------
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    datefmt="%d-%m-%Y | %I:%M%p",
-    handlers=[logging.FileHandler("ecg_api.log"), logging.StreamHandler()],
-)
+# Records are only enqueued on the event loop; a background listener thread
+# does the file and console writes.
+log_queue = queue.SimpleQueue()
+log_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s", datefmt="%d-%m-%Y | %I:%M%p")
+log_handlers = [logging.FileHandler("ecg_api.log"), logging.StreamHandler()]
+for handler in log_handlers:
+    handler.setFormatter(log_formatter)
+log_listener = QueueListener(log_queue, *log_handlers)
+
+# The queue handler passes the bare message through; the listener's handlers format it
+logging.basicConfig(level=logging.INFO, format="%(message)s", handlers=[QueueHandler(log_queue)], force=True)
 logger = logging.getLogger(__name__)
 
 
 # ------------------------------------------------------------------------------
 # Rate Limiting
 # ------------------------------------------------------------------------------
-limiter = Limiter(key_func=get_remote_address)
+# Fixed one-minute windows counted in-process per (client, route). Each worker
+# keeps its own counters; back this with a shared store (e.g. Redis INCR +
+# EXPIRE) if the API is ever run with several workers behind one limit.
+RATE_LIMIT_WINDOW = 60
+_rate_window = 0
+_rate_counts: Dict[tuple, int] = {}
+
+
+def rate_limit(max_requests: int):
+    def decorator(func):
+        route = func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(request: Request, *args, **kwargs):
+            global _rate_window
+            window = int(time.monotonic()) // RATE_LIMIT_WINDOW
+            if window != _rate_window:
+                _rate_window = window
+                _rate_counts.clear()
+            key = (request.client.host if request.client else "127.0.0.1", route)
+            count = _rate_counts.get(key, 0)
+            if count >= max_requests:
+                raise HTTPException(
+                    status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail=f"Rate limit exceeded: {max_requests} per minute",
+                )
+            _rate_counts[key] = count + 1
+            return await func(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
 
 
 # ------------------------------------------------------------------------------
@@ -52,11 +93,75 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+# In-flight requests per client. Everything runs on one event loop, so the
+# counter needs no lock; it is per worker like the rate limiter.
+MAX_CONCURRENT_REQUESTS = 50
+_inflight: Dict[str, int] = {}
+TOO_MANY_REQUESTS_RESPONSE = ORJSONResponse(
+    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+    content={"detail": f"Too many concurrent requests: limit is {MAX_CONCURRENT_REQUESTS}"},
+)
+
+
+# Routes that answer whether or not the data service loaded
+UNGUARDED_PATHS = frozenset({"/", "/health", "/docs", "/redoc", "/openapi.json"})
+NOT_LOADED_RESPONSE = ORJSONResponse(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": "Data service not loaded"}
+)
+
+
+class RequestGate:
+    """Pure ASGI middleware: rejects data routes until the data service loads,
+    bounds in-flight requests per client, then times the request, adding an
+    X-Process-Time header (microseconds) and a log line."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if not data_loaded and path not in UNGUARDED_PATHS:
+            await NOT_LOADED_RESPONSE(scope, receive, send)
+            return
+
+        client = scope["client"][0] if scope.get("client") else "127.0.0.1"
+        inflight = _inflight.get(client, 0)
+        if inflight >= MAX_CONCURRENT_REQUESTS:
+            await TOO_MANY_REQUESTS_RESPONSE(scope, receive, send)
+            return
+        _inflight[client] = inflight + 1
+
+        start = time.perf_counter_ns()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                elapsed_us = (time.perf_counter_ns() - start) // 1000
+                message["headers"] = [*message.get("headers", ()), (b"x-process-time", b"%d" % elapsed_us)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            remaining = _inflight[client] - 1
+            if remaining:
+                _inflight[client] = remaining
+            else:
+                del _inflight[client]
+            logger.info("%s %s in %d us", scope["method"], path, (time.perf_counter_ns() - start) // 1000)
+
+
+app.add_middleware(RequestGate)
+
+
+# Starlette's CORS middleware is pure ASGI and precomputes its headers
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -66,14 +171,6 @@ app.add_middleware(
 )
 
 
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    start = time.time()
-    response = await call_next(request)
-    logger.info(f"{request.method} {request.url.path} in {(time.time() - start) * 1000:.2f} ms")
-    return response
-
-
 # ------------------------------------------------------------------------------
 # State / Utilities
 # ------------------------------------------------------------------------------
@@ -81,8 +178,15 @@ data_loaded = False
 startup_time = None
 
 
+_time_iso_cache = [0, ""]
+
+
 def current_time_iso():
-    return datetime.now().isoformat()
+    # Formatted at most once per wall-clock second
+    now = int(time.time())
+    if now != _time_iso_cache[0]:
+        _time_iso_cache[:] = [now, datetime.fromtimestamp(now).isoformat()]
+    return _time_iso_cache[1]
 
 
 # ------------------------------------------------------------------------------
@@ -163,33 +267,147 @@ class HealthResponse(BaseModel):
 
 class CaseImages(BaseModel):
     case_id: int
-    ecg_single_clean: Optional[str]
-    ecg_12lead_clean: Optional[str]
-    gradcam_single: Optional[str]
-    gradcam_12lead: Optional[str]
-    shap: Optional[str]
+    ecg_single_clean: Optional[str] = None
+    ecg_12lead_clean: Optional[str] = None
+    gradcam_single: Optional[str] = None
+    gradcam_12lead: Optional[str] = None
+    shap: Optional[str] = None
     message: str
 
 
+# ------------------------------------------------------------------------------
+# Precomputed Payloads
+# ------------------------------------------------------------------------------
+# Read-only endpoints serve data that never changes after startup, so their
+# JSON is encoded once here and each request only copies the bytes out.
+_CACHED_JSON: Dict[str, bytes] = {}
+
+
+ROOT_JSON = dumps({
+    "app": "ECG Classification API",
+    "purpose": "Serve precomputed cardiac ECG analysis results with clinical-grade precision.",
+    "model": {
+        "type": "ResNet-1D + Dense Multimodal Network",
+        "performance": {
+            "MI_sensitivity": "96.2%",
+            "MI_specificity": "100.0%",
+            "overall_accuracy": "87.4%",
+        },
+        "training_data": "PTB-XL Dataset (22,000 ECG records, 19,000 patients)",
+    },
+    "author": "Ridwan Oladipo, MD | AI Specialist",
+    "version": "1.0.0",
+    "documentation": "/docs",
+})
+
+
+def build_health_payload():
+    _CACHED_JSON["health"] = dumps({
+        "status": "ok" if data_loaded else "error",
+        "data_loaded": data_loaded,
+        "startup_time": startup_time,
+        "version": "1.0.0",
+    })
+
+
+# Not-loaded payload until the startup hook runs, so /health never raises
+build_health_payload()
+
+
+def build_cached_payloads():
+    metrics = data_service.get_metrics_summary()
+    performance = metrics["performance_metrics"]
+    _CACHED_JSON["metrics_summary"] = dumps(MetricsSummary(
+        model_name=metrics["model_name"],
+        version=metrics["version"],
+        architecture=metrics["architecture"],
+        performance_metrics=PerformanceMetrics(
+            test_accuracy=performance["test_accuracy"],
+            macro_f1=performance["macro_f1"],
+            class_f1_scores=performance["class_f1_scores"],
+            mi_clinical_metrics=MIMetrics(**performance["mi_clinical_metrics"]),
+        ),
+        test_cases=metrics["test_cases"],
+        timestamp="",
+    ).model_dump(exclude={"timestamp"}))
+
+    robustness = data_service.get_robustness_summary()
+    _CACHED_JSON["robustness_summary"] = dumps(RobustnessSummary(
+        jitter_levels=robustness.get("jitter_levels", []),
+        jitter_performance=robustness.get("jitter_performance", []),
+        scale_factors=robustness.get("scale_factors", []),
+        scale_performance=robustness.get("scale_performance", []),
+        timestamp="",
+    ).model_dump(exclude={"timestamp"}))
+
+    # A case missing a listed field is left out rather than failing the whole list
+    fields = CaseInfo.model_fields.keys()
+    cases = []
+    for case in data_service.get_demo_cases():
+        try:
+            cases.append({k: case[k] for k in fields})
+        except KeyError as e:
+            logger.warning(f"Skipping case {case.get('case_id')} in case list: missing {e}")
+    _CACHED_JSON["cases"] = dumps(cases)
+    _CACHED_JSON["roc_pr_curves"] = dumps(data_service.get_roc_pr_data())
+
+    # Empty payloads are left out so their endpoints keep answering 404
+    calibration = data_service.get_calibration_data()
+    if calibration:
+        _CACHED_JSON["calibration"] = dumps(calibration)
+    demographics = data_service.get_demographic_analysis()
+    if demographics:
+        _CACHED_JSON["demographic_analysis"] = dumps(demographics)
+
+
+def json_bytes_response(blob: bytes) -> Response:
+    return Response(content=blob, media_type="application/json")
+
+
+@functools.lru_cache(maxsize=1024)
+def etag_for(blob: bytes) -> str:
+    return '"%s"' % hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+
+def cached_response(request: Request, blob: bytes, media_type: str = "application/json") -> Response:
+    """Serve immutable bytes with an ETag, answering 304 when the client has them."""
+    etag = etag_for(blob)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(content=blob, media_type=media_type, headers={"ETag": etag})
+
+
+def with_timestamp(blob: bytes) -> bytes:
+    """Append a fresh `timestamp` key to a cached JSON object."""
+    return b"%s,\"timestamp\":\"%s\"}" % (blob[:-1], current_time_iso().encode())
+
+
 # ------------------------------------------------------------------------------
 # Startup / Shutdown
 # ------------------------------------------------------------------------------
 @app.on_event("startup")
 async def startup_event():
     global data_loaded, startup_time
+    log_listener.start()
     startup_time = current_time_iso()
     logger.info("Starting ECG Classification API...")
     try:
         data_loaded = initialize_data_service()
+        if data_loaded:
+            build_cached_payloads()
         logger.info("Data service ready" if data_loaded else "Data service failed to load")
     except Exception as e:
+        # A half-built payload cache must not be served; report not loaded instead
+        data_loaded = False
         logger.error(f"Startup error: {e}")
         logger.error(traceback.format_exc())
+    build_health_payload()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down ECG Classification API...")
+    log_listener.stop()
 
 
 # ------------------------------------------------------------------------------
@@ -197,240 +415,148 @@ async def shutdown_event():
 # ------------------------------------------------------------------------------
 @app.get("/", summary="ECG Diagnosis API Overview", tags=["App Info"])
 async def root():
-    return {
-        "app": "ECG Classification API",
-        "purpose": "Serve precomputed cardiac ECG analysis results with clinical-grade precision.",
-        "model": {
-            "type": "ResNet-1D + Dense Multimodal Network",
-            "performance": {
-                "MI_sensitivity": "96.2%",
-                "MI_specificity": "100.0%",
-                "overall_accuracy": "87.4%",
-            },
-            "training_data": "PTB-XL Dataset (22,000 ECG records, 19,000 patients)",
-        },
-        "author": "Ridwan Oladipo, MD | AI Specialist",
-        "version": "1.0.0",
-        "documentation": "/docs",
-    }
+    return json_bytes_response(ROOT_JSON)
 
 
 @app.get("/health", response_model=HealthResponse, summary="Service Health Check", tags=["Health"])
 async def health_check():
-    return HealthResponse(
-        status="ok" if data_loaded else "error",
-        data_loaded=data_loaded,
-        version="1.0.0",
-        startup_time=startup_time,
-        timestamp=current_time_iso(),
-    )
+    return json_bytes_response(with_timestamp(_CACHED_JSON["health"]))
 
 
 @app.get("/cases", response_model=List[CaseInfo], summary="Get All Curated Cases", tags=["Cases"])
-@limiter.limit("10/minute")
+@rate_limit(10)
 async def get_cases(request: Request):
-    if not data_loaded:
-        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="Data service not loaded")
-    try:
-        logger.info("Cases list requested")
-        cases = data_service.get_demo_cases()
-        return [CaseInfo(**{k: v for k, v in case.items() if k in CaseInfo.__fields__}) for case in cases]
-    except Exception as e:
-        logger.error(f"Error getting cases: {e}")
-        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve cases")
+    logger.info("Cases list requested")
+    return cached_response(request, _CACHED_JSON["cases"])
 
 
 @app.get("/case/{case_id}", summary="Get Case Details", tags=["Cases"])
-@limiter.limit("10/minute")
+@rate_limit(10)
 async def get_case_details(request: Request, case_id: int):
-    if not data_loaded:
-        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="Data service not loaded")
-    try:
-        logger.info(f"Case details requested: {case_id}")
-        case_data = data_service.get_case_details(case_id)
-        if not case_data:
-            raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f"Case {case_id} not found")
-        return case_data
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting case details: {e}")
-        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve case details")
+    logger.info(f"Case details requested: {case_id}")
+    case_data = data_service.get_case_details_json(case_id)
+    if not case_data:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f"Case {case_id} not found")
+    return cached_response(request, case_data)
 
 
 @app.get("/case/{case_id}/prediction", response_model=CasePrediction, summary="Get Case Prediction", tags=["Cases"])
-@limiter.limit("10/minute")
+@rate_limit(10)
 async def get_case_prediction(request: Request, case_id: int):
-    if not data_loaded:
-        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="Data service not loaded")
-    try:
-        logger.info(f"Prediction requested: {case_id}")
-        prediction = data_service.get_case_prediction(case_id)
-        if not prediction:
-            raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f"Prediction for case {case_id} not found")
-        return CasePrediction(**prediction)
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting prediction: {e}")
-        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve prediction")
+    logger.info(f"Prediction requested: {case_id}")
+    prediction = data_service.get_case_prediction_json(case_id)
+    if not prediction:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f"Prediction for case {case_id} not found")
+    return cached_response(request, prediction)
 
 
 @app.get("/clinical-report/{case_id}", response_model=ClinicalReport, summary="Get Clinical Report", tags=["Clinical"])
-@limiter.limit("10/minute")
+@rate_limit(10)
 async def get_clinical_report(request: Request, case_id: int):
-    if not data_loaded:
-        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="Data service not loaded")
-    try:
-        logger.info(f"Clinical report requested: {case_id}")
-        report = data_service.get_clinical_report(case_id)
-        if not report:
-            raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f"Clinical report for case {case_id} not found")
-        return ClinicalReport(
-            demographics=Demographics(**report["demographics"]),
-            **{k: v for k, v in report.items() if k != "demographics"},
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting clinical report: {e}")
-        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve clinical report")
+    logger.info(f"Clinical report requested: {case_id}")
+    report = data_service.get_clinical_report_json(case_id)
+    if not report:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f"Clinical report for case {case_id} not found")
+    return cached_response(request, report)
 
 
 @app.post("/generate-report/{case_id}", response_model=ClinicalReport, summary="Generate Clinical Report", tags=["Clinical"])
-@limiter.limit("5/minute")
+@rate_limit(5)
 async def generate_clinical_report(request: Request, case_id: int):
-    if not data_loaded:
-        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="Data service not loaded")
-    try:
-        logger.info(f"Report generation requested: {case_id}")
-        report = data_service.generate_clinical_report(case_id)
-        if not report:
-            raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f"Cannot generate report for case {case_id}")
-        return ClinicalReport(
-            demographics=Demographics(**report["demographics"]),
-            **{k: v for k, v in report.items() if k != "demographics"},
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error generating clinical report: {e}")
-        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to generate clinical report")
+    logger.info(f"Report generation requested: {case_id}")
+    report = data_service.generate_clinical_report_json(case_id)
+    if not report:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f"Cannot generate report for case {case_id}")
+    return json_bytes_response(report)
 
 
 @app.get("/metrics-summary", response_model=MetricsSummary, summary="Get Model Performance Summary", tags=["Performance"])
-@limiter.limit("10/minute")
+@rate_limit(10)
 async def get_metrics_summary(request: Request):
-    if not data_loaded:
-        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="Data service not loaded")
-    try:
-        logger.info("Metrics summary requested")
-        metrics = data_service.get_metrics_summary()
-        performance = metrics["performance_metrics"]
-        return MetricsSummary(
-            model_name=metrics["model_name"],
-            version=metrics["version"],
-            architecture=metrics["architecture"],
-            performance_metrics=PerformanceMetrics(
-                test_accuracy=performance["test_accuracy"],
-                macro_f1=performance["macro_f1"],
-                class_f1_scores=performance["class_f1_scores"],
-                mi_clinical_metrics=MIMetrics(**performance["mi_clinical_metrics"]),
-            ),
-            test_cases=metrics["test_cases"],
-            timestamp=current_time_iso(),
-        )
-    except Exception as e:
-        logger.error(f"Error getting metrics summary: {e}")
-        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve metrics summary")
+    logger.info("Metrics summary requested")
+    return json_bytes_response(with_timestamp(_CACHED_JSON["metrics_summary"]))
 
 
 @app.get("/robustness-summary", response_model=RobustnessSummary, summary="Get Robustness Analysis", tags=["Performance"])
-@limiter.limit("10/minute")
+@rate_limit(10)
 async def get_robustness_summary(request: Request):
-    if not data_loaded:
-        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="Data service not loaded")
-    try:
-        logger.info("Robustness summary requested")
-        robustness = data_service.get_robustness_summary()
-        return RobustnessSummary(
-            jitter_levels=robustness.get("jitter_levels", []),
-            jitter_performance=robustness.get("jitter_performance", []),
-            scale_factors=robustness.get("scale_factors", []),
-            scale_performance=robustness.get("scale_performance", []),
-            timestamp=current_time_iso(),
-        )
-    except Exception as e:
-        logger.error(f"Error getting robustness summary: {e}")
-        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve robustness summary")
+    logger.info("Robustness summary requested")
+    return json_bytes_response(with_timestamp(_CACHED_JSON["robustness_summary"]))
 
 
 @app.get("/calibration", summary="Get Calibration Data", tags=["Performance"])
-@limiter.limit("10/minute")
+@rate_limit(10)
 async def get_calibration_data(request: Request):
-    if not data_loaded:
-        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="Data service not loaded")
-    try:
-        logger.info("Calibration data requested")
-        calibration = data_service.get_calibration_data()
-        if not calibration:
-            raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Calibration data not found")
-        return calibration
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting calibration data: {e}")
-        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve calibration data")
+    logger.info("Calibration data requested")
+    calibration = _CACHED_JSON.get("calibration")
+    if not calibration:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Calibration data not found")
+    return cached_response(request, calibration)
 
 
 @app.get("/roc-pr-curves", summary="Get ROC and PR Curve Data", tags=["Performance"])
-@limiter.limit("10/minute")
+@rate_limit(10)
 async def get_roc_pr_curves(request: Request):
-    if not data_loaded:
-        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="Data service not loaded")
-    try:
-        logger.info("ROC/PR curves requested")
-        curves = data_service.get_roc_pr_data()
-        return curves
-    except Exception as e:
-        logger.error(f"Error getting ROC/PR curves: {e}")
-        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve curve data")
+    logger.info("ROC/PR curves requested")
+    return cached_response(request, _CACHED_JSON["roc_pr_curves"])
+
+
+@app.get("/curves.npz", summary="Get ROC, PR and Calibration Curves as NumPy Arrays", tags=["Performance"])
+@rate_limit(10)
+async def get_curves_npz(request: Request):
+    """Same curves as /roc-pr-curves and /calibration as a compressed .npz archive.
+
+    Curve points (fpr/tpr, precision/recall, calibration bins) are stored as
+    float16, which rounds them to about three significant digits; scalar
+    summaries such as AUC stay float32. Use the JSON endpoints for exact values.
+    """
+    logger.info("Curve arrays requested")
+    # The first call imports NumPy and compresses ~1 MB; keep that off the event loop
+    curves = await asyncio.to_thread(data_service.get_curves_npz)
+    if not curves:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Curve data not found")
+    return cached_response(request, curves, media_type="application/octet-stream")
 
 
 @app.get("/demographic-analysis", summary="Get Demographic Performance Analysis", tags=["Performance"])
-@limiter.limit("10/minute")
+@rate_limit(10)
 async def get_demographic_analysis(request: Request):
-    if not data_loaded:
-        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="Data service not loaded")
-    try:
-        logger.info("Demographic analysis requested")
-        demographics = data_service.get_demographic_analysis()
-        if not demographics:
-            raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Demographic analysis not found")
-        return demographics
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting demographic analysis: {e}")
-        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve demographic analysis")
+    logger.info("Demographic analysis requested")
+    demographics = _CACHED_JSON.get("demographic_analysis")
+    if not demographics:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Demographic analysis not found")
+    return cached_response(request, demographics)
 
 
 @app.get("/case/{case_id}/images", response_model=CaseImages, summary="Get Image File Paths", tags=["Media"])
-@limiter.limit("10/minute")
+@rate_limit(10)
 async def get_case_images(request: Request, case_id: int):
-    if not data_loaded:
-        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail="Data service not loaded")
-    try:
-        logger.info(f"Image paths requested: {case_id}")
-        images = data_service.get_case_images(case_id)
-        if not images:
-            raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f"Images for case {case_id} not found")
-        return CaseImages(**images)
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting images: {e}")
-        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve image paths")
+    logger.info(f"Image paths requested: {case_id}")
+    images = data_service.get_case_images_json(case_id)
+    if not images:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail=f"Images for case {case_id} not found")
+    return cached_response(request, images)
+
+
+# ------------------------------------------------------------------------------
+# Static Media
+# ------------------------------------------------------------------------------
+class ImmutableStaticFiles(StaticFiles):
+    """Static files that never change once deployed; browsers and CDNs may keep them."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+# Filenames listed by /case/{case_id}/images resolve under these prefixes
+for subfolder in ("precolored_ecgs", "curated_cases"):
+    app.mount(
+        f"/images/{subfolder}",
+        ImmutableStaticFiles(directory=data_service.data_path / subfolder, check_dir=False),
+        name=f"images-{subfolder}",
+    )
 
 
 # ------------------------------------------------------------------------------
@@ -439,18 +565,31 @@ async def get_case_images(request: Request, case_id: int):
 @app.exception_handler(ValueError)
 async def value_error_handler(request, exc):
     logger.error(f"Validation error: {exc}")
-    return JSONResponse(status_code=422, content={"detail": f"Validation error: {exc}", "time": current_time_iso()})
+    return ORJSONResponse(status_code=422, content={"detail": f"Validation error: {exc}", "time": current_time_iso()})
 
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     logger.error(f"Unhandled error: {exc}")
     logger.error(traceback.format_exc())
-    return JSONResponse(status_code=500, content={"detail": "Unexpected error occurred", "time": current_time_iso()})
+    return ORJSONResponse(status_code=500, content={"detail": "Unexpected error occurred", "time": current_time_iso()})
 
 
 # ------------------------------------------------------------------------------
 # Uvicorn Entry Point
 # ------------------------------------------------------------------------------
 if __name__ == "__main__":
-    uvicorn.run("api:app", host="0.0.0.0", port=8000, reload=True, log_level="info")
+    # Rate limits and the concurrency gate are counted per process, so one
+    # worker by default keeps them exact until they move to a shared store
+    workers = int(os.getenv("API_WORKERS", 1))
+    if workers > 1:
+        logger.warning(f"Running {workers} workers: rate and concurrency limits apply per worker")
+    uvicorn.run(
+        "api:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=workers,
+        log_level="info",
+    )
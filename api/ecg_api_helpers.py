@@ -5,13 +5,17 @@ API for serving precomputed ECG cardiac analysis results.
 Author: Ridwan Oladipo, MD | AI Specialist
 """
 
-import json
+import io
 import logging
+import os
+import pickle
+import tempfile
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
 from pathlib import Path
-import pandas as pd
-import numpy as np
+import orjson
+from .orjson_response import dumps
 
 warnings.filterwarnings("ignore")
 
@@ -19,6 +23,21 @@ warnings.filterwarnings("ignore")
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DATA_FILES = ('curated_cases.json', 'model_card.json', 'performance_data.json')
+# Parsed-data cache lives outside the served data directory; it is unpickled at start
+CACHE_DIR = Path(os.getenv('ECG_API_CACHE_DIR', Path.home() / '.cache' / 'ecg-api'))
+CACHE_FILE = 'data_cache.pkl'
+CURVE_SECTIONS = ('roc_curves', 'pr_curves', 'calibration')
+
+# Image type -> (subfolder, filename pattern)
+IMAGE_FILES = {
+    'ecg_single_clean': ('precolored_ecgs', 'case_{}_ecg_single_clean.png'),
+    'ecg_12lead_clean': ('precolored_ecgs', 'case_{}_ecg_12lead_clean.png'),
+    'gradcam_single': ('curated_cases', 'case_{}_gradcam_single.png'),
+    'gradcam_12lead': ('curated_cases', 'case_{}_gradcam_12lead.png'),
+    'shap': ('curated_cases', 'case_{}_shap.png')
+}
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 #                            Core Data Service Class
@@ -32,6 +51,13 @@ class ECGDataService:
         self.model_card = None
         self.performance_data = None
         self.data_path = Path("evaluation_results")
+        self._case_index = {}
+        self._details_json = {}
+        self._prediction_json = {}
+        self._report_json = {}
+        self._image_map = {}
+        self._image_json = {}
+        self._curves_npz = None
 
     # ───────────────────────────────────────────────────────────────────────────
     # Data loading
@@ -41,17 +67,32 @@ class ECGDataService:
         try:
             logger.info("Loading ECG classification data...")
 
-            # Load curated cases
-            with open(self.data_path / 'curated_cases.json', 'r') as f:
-                self.curated_cases = json.load(f)
-
-            # Load model card
-            with open(self.data_path / 'model_card.json', 'r') as f:
-                self.model_card = json.load(f)
-
-            # Load performance data
-            with open(self.data_path / 'performance_data.json', 'r') as f:
-                self.performance_data = json.load(f)
+            cached = self._read_cache()
+            if cached:
+                self.curated_cases, self.model_card, self.performance_data = cached
+            else:
+                # Curated cases, model card and performance data; file reads overlap
+                with ThreadPoolExecutor(len(DATA_FILES)) as pool:
+                    self.curated_cases, self.model_card, self.performance_data = pool.map(
+                        lambda name: orjson.loads((self.data_path / name).read_bytes()), DATA_FILES
+                    )
+
+                self._write_cache()
+
+            self._case_index = {case['case_id']: case for case in self.curated_cases if 'case_id' in case}
+            self._build_case_payloads()
+            self._image_map = self._build_image_map()
+            self._image_json = {
+                case_id: dumps({
+                    'case_id': case_id,
+                    **{key: images.get(key) for key in IMAGE_FILES},
+                    'message': images['message']
+                })
+                for case_id, images in self._image_map.items()
+            }
+
+            # Built on first request so NumPy is only imported if /curves.npz is used
+            self._curves_npz = None
 
             logger.info("All data loaded successfully")
             return True
@@ -60,6 +101,55 @@ class ECGDataService:
             logger.error(f"Failed to load data: {str(e)}")
             return False
 
+    def _build_case_payloads(self):
+        """Encode each case's payloads; a malformed case only loses the payloads it cannot build."""
+        self._details_json, self._prediction_json, self._report_json = {}, {}, {}
+        payloads = (
+            (self._details_json, self.get_case_details),
+            (self._prediction_json, self.get_case_prediction),
+            (self._report_json, self.get_clinical_report),
+        )
+        for case_id in self._case_index:
+            for table, build in payloads:
+                try:
+                    table[case_id] = dumps(build(case_id))
+                except Exception as e:
+                    logger.warning(f"Skipping {build.__name__} for case {case_id}: {str(e)}")
+
+    def _source_signature(self) -> tuple:
+        """Data directory plus size and mtime of each JSON source, used to invalidate the cache."""
+        return (str(self.data_path.resolve()),) + tuple(
+            (stat.st_size, stat.st_mtime_ns)
+            for stat in (os.stat(self.data_path / name) for name in DATA_FILES)
+        )
+
+    def _read_cache(self) -> Optional[tuple]:
+        """Return the pickled data if it still matches the JSON sources."""
+        try:
+            with open(CACHE_DIR / CACHE_FILE, 'rb') as f:
+                signature, data = pickle.load(f)
+            return data if signature == self._source_signature() else None
+        except Exception:
+            return None
+
+    def _write_cache(self):
+        """Pickle the parsed data so later starts and workers skip JSON parsing."""
+        try:
+            data = (self.curated_cases, self.model_card, self.performance_data)
+            CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+            # Write a private temp file and rename it in, so concurrent workers
+            # never read a partially written cache
+            fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump((self._source_signature(), data), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, CACHE_DIR / CACHE_FILE)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Could not write data cache: {str(e)}")
+
     # ───────────────────────────────────────────────────────────────────────────
     # Demo cases
     # ───────────────────────────────────────────────────────────────────────────
@@ -71,14 +161,7 @@ class ECGDataService:
 
     def get_case_details(self, case_id: int) -> Optional[Dict[str, Any]]:
         """Get detailed information for a specific case."""
-        if not self.curated_cases:
-            return None
-
-        for case in self.curated_cases:
-            if case['case_id'] == case_id:
-                return case
-
-        return None
+        return self._case_index.get(case_id)
 
     def get_case_prediction(self, case_id: int) -> Optional[Dict[str, Any]]:
         """Get prediction results for a specific case."""
@@ -163,40 +246,93 @@ class ECGDataService:
 
         return self.performance_data['slice_analysis']
 
+    def _build_curves_npz(self) -> bytes:
+        """Pack ROC, PR and calibration arrays into one compressed .npz buffer.
+
+        Curve points are plotting data and ship as float16; scalar summaries
+        (AUC, Brier score) keep float32.
+        """
+        import numpy as np
+
+        arrays = {}
+        for section in CURVE_SECTIONS:
+            for class_name, curve in self.performance_data.get(section, {}).items():
+                for field, values in curve.items():
+                    dtype = np.float16 if isinstance(values, list) else np.float32
+                    arrays[f'{section}.{class_name}.{field}'] = np.asarray(values, dtype=dtype)
+
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **arrays)
+        return buffer.getvalue()
+
+    def get_curves_npz(self) -> Optional[bytes]:
+        """Get ROC, PR and calibration curves as .npz bytes ('<section>.<class>.<field>' keys).
+
+        Packed on first call and kept; a packing failure is logged once and
+        remembered as empty bytes, so the route keeps answering 404.
+        """
+        if self._curves_npz is None and self.performance_data is not None:
+            try:
+                self._curves_npz = self._build_curves_npz()
+            except Exception as e:
+                self._curves_npz = b''
+                logger.warning(f"Could not build curve archive: {str(e)}")
+        return self._curves_npz
+
     # ───────────────────────────────────────────────────────────────────────────
     # Media files
     # ───────────────────────────────────────────────────────────────────────────
+    def _build_image_map(self) -> Dict[int, Dict[str, Any]]:
+        """List each image folder once and record which files every case has."""
+        available = {}
+        for subfolder in {subfolder for subfolder, _ in IMAGE_FILES.values()}:
+            try:
+                with os.scandir(self.data_path / subfolder) as entries:
+                    available[subfolder] = {entry.name for entry in entries if entry.is_file()}
+            except FileNotFoundError:
+                available[subfolder] = set()
+
+        image_map = {}
+        for case_id in self._case_index:
+            images = {'case_id': case_id}
+
+            for image_type, (subfolder, pattern) in IMAGE_FILES.items():
+                filename = pattern.format(case_id)
+                if filename in available[subfolder]:
+                    images[image_type] = filename
+
+            if len(images) > 1:
+                images['message'] = f"Image files available for case {case_id}"
+                image_map[case_id] = images
+
+        return image_map
+
     def get_case_images(self, case_id: int) -> Optional[Dict[str, Any]]:
         """Get image file paths for a case."""
-        # Check if images exist for the case
-        precolored_single = self.data_path / 'precolored_ecgs' / f'case_{case_id}_ecg_single_clean.png'
-        precolored_12lead = self.data_path / 'precolored_ecgs' / f'case_{case_id}_ecg_12lead_clean.png'
-        gradcam_single = self.data_path / 'curated_cases' / f'case_{case_id}_gradcam_single.png'
-        gradcam_12lead = self.data_path / 'curated_cases' / f'case_{case_id}_gradcam_12lead.png'
-        shap_image = self.data_path / 'curated_cases' / f'case_{case_id}_shap.png'
-
-        images = {'case_id': case_id}
+        return self._image_map.get(case_id)
 
-        if precolored_single.exists():
-            images['ecg_single_clean'] = f'case_{case_id}_ecg_single_clean.png'
-
-        if precolored_12lead.exists():
-            images['ecg_12lead_clean'] = f'case_{case_id}_ecg_12lead_clean.png'
-
-        if gradcam_single.exists():
-            images['gradcam_single'] = f'case_{case_id}_gradcam_single.png'
+    # ───────────────────────────────────────────────────────────────────────────
+    # Serialized per-case responses
+    # ───────────────────────────────────────────────────────────────────────────
+    def get_case_details_json(self, case_id: int) -> Optional[bytes]:
+        """JSON-encoded case details, built at load time."""
+        return self._details_json.get(case_id)
 
-        if gradcam_12lead.exists():
-            images['gradcam_12lead'] = f'case_{case_id}_gradcam_12lead.png'
+    def get_case_prediction_json(self, case_id: int) -> Optional[bytes]:
+        """JSON-encoded prediction results, built at load time."""
+        return self._prediction_json.get(case_id)
 
-        if shap_image.exists():
-            images['shap'] = f'case_{case_id}_shap.png'
+    def get_clinical_report_json(self, case_id: int) -> Optional[bytes]:
+        """JSON-encoded clinical report, built at load time."""
+        return self._report_json.get(case_id)
 
-        if len(images) == 1:
-            return None
+    def generate_clinical_report_json(self, case_id: int) -> Optional[bytes]:
+        """Generate JSON-encoded clinical report (returns precomputed result)."""
+        return self.get_clinical_report_json(case_id)
 
-        images['message'] = f"Image files available for case {case_id}"
-        return images
+    def get_case_images_json(self, case_id: int) -> Optional[bytes]:
+        """JSON-encoded image file paths (missing images as null), built at load time."""
+        return self._image_json.get(case_id)
 
     # ───────────────────────────────────────────────────────────────────────────
     # Data validation
@@ -0,0 +1,25 @@
+"""
+🫀 ECG Diagnosis API - JSON Encoding
+Shared orjson encoding for live responses and precomputed payloads.
+
+Author: Ridwan Oladipo, MD | AI Specialist
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+# NumPy arrays serialize natively; integer keys (e.g. case ids) are allowed
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -6,10 +6,21 @@ Author: Ridwan Oladipo, MD | Clinical AI Architect
 """
 
 import streamlit as st
-import numpy as np
-import pandas as pd
-import time
-from ecg_ui_helpers import *
+from ecg_ui_helpers import (
+    load_custom_css,
+    load_evaluation_data,
+    display_model_card,
+    render_metric_cards,
+    display_ecg_image,
+    simulate_prediction_progress,
+    display_prediction_results,
+    display_shap_analysis,
+    display_clinical_note,
+    display_performance_plots,
+    create_case_explorer_grid,
+    display_robustness_results,
+    display_footer,
+)
 
 
 st.set_page_config(
@@ -20,33 +31,163 @@ st.set_page_config(
 )
 
 
+# Static HTML blocks, built once at import
+HEADER_HTML = """
+<div class="cardiac-header">
+    <h1>🫀 ECG Diagnosis AI</h1>
+    <p>AI-assisted interpretation of cardiac electrical activity</p>
+    <p><strong>By Ridwan Oladipo, MD | Clinical AI Architect</strong></p>
+</div>
+"""
+
+SUCCESS_HTML = """
+<div class="success-indicator">
+    ✅ AI Model Ready | 96.2% MI Sensitivity
+</div>
+"""
+
+CLINICAL_INSIGHT_HTML = """
+<div style="background: #f8fafc; border-left: 4px solid #dc2626; border-right: 4px solid #dc2626;
+             padding: 0.8rem 1rem; border-radius: 10px; margin-top: 0.6rem;
+             box-shadow: 0 2px 8px rgba(0,0,0,0.08);">
+<b>Clinical Insight:</b> Exceptional MI sensitivity (96.2%) and perfect specificity (100%) highlight a clinically safe model — highly effective for early cardiac event detection with near-zero false alarms.
+</div>
+"""
+
+
+def start_prediction():
+    """Button callback: reveal the report and play the analysis progress once"""
+    st.session_state.show_prediction = True
+    st.session_state.prediction_pending = True
+
+
+@st.fragment
+def render_prediction_tab(curated_cases):
+    """ECG prediction tab; its widgets rerun only this fragment"""
+    st.markdown("")
+
+    # Case Selection
+    st.markdown("")
+    if 'case_options' not in st.session_state:
+        st.session_state.case_options = [f"Case {case['case_id']}: {case['description']}" for case in curated_cases]
+    case_options = st.session_state.case_options
+    selected_case_idx = st.selectbox(
+        "Select a patient case below to analyze their ECG with our AI model:",
+        range(len(case_options)),
+        format_func=lambda x: case_options[x],
+        key="case_selector"
+    )
+
+    st.markdown("")
+    selected_case = curated_cases[selected_case_idx]
+    case_id = selected_case['case_id']
+
+    # Session State
+    if 'show_prediction' not in st.session_state:
+        st.session_state.show_prediction = False
+    if 'current_case_id' not in st.session_state:
+        st.session_state.current_case_id = None
+
+    # Reset prediction when switching case
+    if st.session_state.current_case_id != case_id:
+        st.session_state.show_prediction = False
+        st.session_state.current_case_id = case_id
+
+    # Demographics
+    if not st.session_state.show_prediction:
+        demographics = selected_case['demographics']
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Age", f"{demographics['age']:.0f} years")
+        with col2:
+            st.metric("Sex", demographics['sex'])
+        with col3:
+            st.metric("Heart Rate", f"{demographics.get('heart_rate', 'N/A')} bpm")
+        with col4:
+            st.metric("Rhythm", demographics.get('rhythm', 'N/A'))
+
+    # ECG Display
+    st.markdown('<div class="ecg-viewer">', unsafe_allow_html=True)
+
+    view_type = st.radio(
+        "ECG View:",
+        ["Lead II (Single)", "12-Lead View"],
+        horizontal=True,
+        key="view_toggle"
+    )
+
+    display_view = "single" if view_type == "Lead II (Single)" else "12lead"
+
+    # Before prediction
+    if not st.session_state.show_prediction:
+        st.markdown("#### Pre-Colored ECG Trace")
+        st.info("ECG color-coded by true diagnosis.")
+        overlay_type = "clean"
+
+    # After prediction
+    else:
+        st.markdown("---")
+        st.markdown("#### 🧠 AI Cardiac Analysis (Grad-CAM + Prediction)")
+        st.info("Interpretability-enhanced AI diagnosis based on 12-lead ECG.")
+        st.markdown("")
+
+        # Show original ECG checkbox
+        show_original = st.checkbox(
+            "Show original ECG for comparison",
+            value=False,
+            key="show_original_toggle",
+            help="Toggle to view the pre-colored ECG instead of Grad-CAM overlay."
+        )
+
+        overlay_type = "clean" if show_original else "gradcam"
+
+    # Display ECG image
+    display_ecg_image(case_id, display_view, overlay_type)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # Prediction Trigger
+    if not st.session_state.show_prediction:
+        st.markdown("---")
+        st.button(" **Run AI Prediction**", key="predict_btn", use_container_width=True,
+                  on_click=start_prediction)
+
+    # Post-Prediction Report
+    if st.session_state.show_prediction:
+        if st.session_state.pop('prediction_pending', False):
+            simulate_prediction_progress()
+            st.success("✅ AI Prediction Complete!")
+        st.markdown("")
+
+        # Primary + Differential
+        display_prediction_results(selected_case)
+
+        # Explainability + Clinical note
+        st.markdown("---")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("#### 🧩 SHAP Demographic Attribution")
+            display_shap_analysis(case_id)
+        with col2:
+            st.markdown("")
+            display_clinical_note(selected_case)
+
+
 def main():
     # Load custom CSS
     load_custom_css()
 
     # Header
-    st.markdown("""
-    <div class="cardiac-header">
-        <h1>🫀 ECG Diagnosis AI</h1>
-        <p>AI-assisted interpretation of cardiac electrical activity</p>
-        <p><strong>By Ridwan Oladipo, MD | Clinical AI Architect</strong></p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(HEADER_HTML, unsafe_allow_html=True)
 
     # Load data
-    with st.spinner("Loading AI model and evaluation data..."):
-        curated_cases, model_card, performance_data = load_evaluation_data()
+    curated_cases, model_card, performance_data = load_evaluation_data()
 
     if curated_cases is None:
         st.error("Failed to load evaluation data. Please ensure all data files are present.")
         return
 
     # Status indicator
-    st.markdown("""
-    <div class="success-indicator">
-        ✅ AI Model Ready | 96.2% MI Sensitivity
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(SUCCESS_HTML, unsafe_allow_html=True)
 
     # Sidebar with model card
     with st.sidebar:
@@ -62,110 +203,7 @@ def main():
 
     # TAB 1: ECG Prediction
     with tab1:
-        st.markdown("")
-
-        # Case Selection
-        st.markdown("")
-        case_options = [f"Case {case['case_id']}: {case['description']}" for case in curated_cases]
-        selected_case_idx = st.selectbox(
-            "Select a patient case below to analyze their ECG with our AI model:",
-            range(len(case_options)),
-            format_func=lambda x: case_options[x],
-            key="case_selector"
-        )
-
-        st.markdown("")
-        selected_case = curated_cases[selected_case_idx]
-        case_id = selected_case['case_id']
-
-        # Session State
-        if 'show_prediction' not in st.session_state:
-            st.session_state.show_prediction = False
-        if 'current_case_id' not in st.session_state:
-            st.session_state.current_case_id = None
-
-        # Reset prediction when switching case
-        if st.session_state.current_case_id != case_id:
-            st.session_state.show_prediction = False
-            st.session_state.current_case_id = case_id
-
-        # Demographics
-        if not st.session_state.show_prediction:
-            demographics = selected_case['demographics']
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("Age", f"{demographics['age']:.0f} years")
-            with col2:
-                st.metric("Sex", demographics['sex'])
-            with col3:
-                st.metric("Heart Rate", f"{demographics.get('heart_rate', 'N/A')} bpm")
-            with col4:
-                st.metric("Rhythm", demographics.get('rhythm', 'N/A'))
-
-        # ECG Display
-        st.markdown('<div class="ecg-viewer">', unsafe_allow_html=True)
-
-        view_type = st.radio(
-            "ECG View:",
-            ["Lead II (Single)", "12-Lead View"],
-            horizontal=True,
-            key="view_toggle"
-        )
-
-        display_view = "single" if view_type == "Lead II (Single)" else "12lead"
-
-        # Before prediction
-        if not st.session_state.show_prediction:
-            st.markdown("#### Pre-Colored ECG Trace")
-            st.info("ECG color-coded by true diagnosis.")
-            overlay_type = "clean"
-
-        # After prediction
-        else:
-            st.markdown("---")
-            st.markdown("#### 🧠 AI Cardiac Analysis (Grad-CAM + Prediction)")
-            st.info("Interpretability-enhanced AI diagnosis based on 12-lead ECG.")
-            st.markdown("")
-
-            # Show original ECG checkbox
-            show_original = st.checkbox(
-                "Show original ECG for comparison",
-                value=False,
-                key="show_original_toggle",
-                help="Toggle to view the pre-colored ECG instead of Grad-CAM overlay."
-            )
-
-            overlay_type = "clean" if show_original else "gradcam"
-
-        # Display ECG image
-        display_ecg_image(case_id, display_view, overlay_type)
-        st.markdown('</div>', unsafe_allow_html=True)
-
-        # Prediction Trigger
-        if not st.session_state.show_prediction:
-            st.markdown("---")
-            if st.button(" **Run AI Prediction**", key="predict_btn", use_container_width=True):
-                simulate_prediction_progress()
-                st.success("✅ AI Prediction Complete!")
-                st.session_state.show_prediction = True
-                st.rerun()
-
-        # Post-Prediction Report
-        if st.session_state.show_prediction:
-            st.markdown("")
-
-            # Primary + Differential
-            display_prediction_results(selected_case)
-
-            # Explainability + Clinical note
-            st.markdown("---")
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown("#### 🧩 SHAP Demographic Attribution")
-                display_shap_analysis(case_id)
-            with col2:
-                st.markdown("")
-                display_clinical_note(selected_case)
+        render_prediction_tab(curated_cases)
 
     # TAB 2: Performance Metrics
     with tab2:
@@ -176,47 +214,14 @@ def main():
         performance = model_card['performance']
         mi_metrics = performance['mi_clinical_metrics']
 
-        col1, col2, col3, col4 = st.columns(4)
-
-        with col1:
-            st.markdown(f"""
-            <div class="metric-card">
-                <div class="metric-value">{mi_metrics['sensitivity']:.1%}</div>
-                <div class="metric-label">MI Sensitivity</div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        with col2:
-            st.markdown(f"""
-            <div class="metric-card">
-                <div class="metric-value">{mi_metrics['specificity']:.1%}</div>
-                <div class="metric-label">MI Specificity</div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        with col3:
-            st.markdown(f"""
-            <div class="metric-card">
-                <div class="metric-value">{performance['test_accuracy']:.1%}</div>
-                <div class="metric-label">Overall Accuracy</div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        with col4:
-            st.markdown(f"""
-            <div class="metric-card">
-                <div class="metric-value">{performance['macro_f1']:.3f}</div>
-                <div class="metric-label">Macro F1 Score</div>
-            </div>
-            """, unsafe_allow_html=True)
+        render_metric_cards([
+            (f"{mi_metrics['sensitivity']:.1%}", "MI Sensitivity"),
+            (f"{mi_metrics['specificity']:.1%}", "MI Specificity"),
+            (f"{performance['test_accuracy']:.1%}", "Overall Accuracy"),
+            (f"{performance['macro_f1']:.3f}", "Macro F1 Score"),
+        ])
         st.markdown("")
-        st.markdown("""
-        <div style="background: #f8fafc; border-left: 4px solid #dc2626; border-right: 4px solid #dc2626;
-                     padding: 0.8rem 1rem; border-radius: 10px; margin-top: 0.6rem;
-                     box-shadow: 0 2px 8px rgba(0,0,0,0.08);">
-        <b>Clinical Insight:</b> Exceptional MI sensitivity (96.2%) and perfect specificity (100%) highlight a clinically safe model — highly effective for early cardiac event detection with near-zero false alarms.
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(CLINICAL_INSIGHT_HTML, unsafe_allow_html=True)
 
         st.markdown("---")
 
@@ -5,21 +5,23 @@ Medical AI interface for cardiac arrhythmia analysis.
 Author: Ridwan Oladipo, MD | Clinical AI Architect
 """
 
+import io
 import streamlit as st
-import pandas as pd
-import numpy as np
-import json
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import orjson
 from pathlib import Path
-import time
-import base64
+from PIL import Image
 
 
-def load_custom_css():
-    """Load custom CSS for professional cardiac interface"""
-    st.markdown("""
+# Evaluation artifacts, relative to the directory the app is launched from
+BASE_PATH = Path('evaluation_results')
+IMAGE_DIRS = {
+    'base': str(BASE_PATH),
+    'precolored_ecgs': str(BASE_PATH / 'precolored_ecgs'),
+    'curated_cases': str(BASE_PATH / 'curated_cases'),
+}
+
+# Static stylesheet, built once at import
+CUSTOM_CSS = """
     <style>
     /* Import medical-grade fonts */
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
@@ -173,19 +175,30 @@ def load_custom_css():
         }
     }
 
-    /* Fine-tune spacing inside the differential diagnosis dataframe */
-    [data-testid="stDataFrame"] table td,
-    [data-testid="stDataFrame"] table th {
-        padding-left: 0.4rem !important;
-        padding-right: 0.4rem !important;
+    /* Row of metric cards emitted as one block */
+    .metric-grid {
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(120px, 1fr));
+        gap: 0 1rem;
+    }
+
+    /* Keep the sidebar model card metrics in a 2x2 grid */
+    [data-testid="stSidebar"] .metric-grid {
+        grid-template-columns: repeat(2, 1fr);
+    }
+
+    /* Differential diagnosis table */
+    .differential-table {
+        width: 100%;
+        border-collapse: collapse;
+    }
+
+    .differential-table th, .differential-table td {
+        padding: 0.4rem 0.8rem;
+        border-bottom: 1px solid #e5e7eb;
+        text-align: left;
     }
 
-    [data-testid="stDataFrame"] table {
-        border-collapse: collapse !important;
-        width: 60% !important;
-        margin: auto !important;
-    }    
-    
     /* Responsive layout for Clinical Case Explorer */
     .case-grid {
         display: grid;
@@ -200,91 +213,102 @@ def load_custom_css():
     }
     
     </style>
-    """, unsafe_allow_html=True)
+"""
 
 
-def load_evaluation_data():
-    """Load all evaluation data files"""
-    try:
-        # Base path to evaluation results
-        base_path = Path('evaluation_results')
+METRIC_CARD_HTML = (
+    '<div class="metric-card">'
+    '<div class="metric-value">{value}</div>'
+    '<div class="metric-label">{label}</div>'
+    '</div>'
+)
+
+
+def metric_cards_html(cards):
+    """HTML for a row of (value, label) metric cards"""
+    cards_html = "".join(METRIC_CARD_HTML.format(value=value, label=label) for value, label in cards)
+    return f'<div class="metric-grid">{cards_html}</div>'
+
+
+def render_metric_cards(cards):
+    """Render (value, label) metric cards in one markdown block instead of one per column"""
+    st.markdown(metric_cards_html(cards), unsafe_allow_html=True)
+
+
+def load_custom_css():
+    """Load custom CSS for professional cardiac interface"""
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
 
-        # Load curated cases
-        with open(base_path / 'curated_cases.json', 'r') as f:
-            curated_cases = json.load(f)
+# performance_data sections used by the UI; plots are pre-rendered images
+PERFORMANCE_SECTIONS = ('robustness',)
 
-        # Load model card
-        with open(base_path / 'model_card.json', 'r') as f:
-            model_card = json.load(f)
 
-        # Load performance data
-        with open(base_path / 'performance_data.json', 'r') as f:
-            performance_data = json.load(f)
+@st.cache_resource(show_spinner=False)
+def read_evaluation_data():
+    """Read all evaluation data files once per process (shared read-only, not copied per rerun)"""
+    # Load curated cases
+    curated_cases = orjson.loads((BASE_PATH / 'curated_cases.json').read_bytes())
 
-        return curated_cases, model_card, performance_data
+    # Resolve diagnosis CSS classes once instead of on every render
+    for case in curated_cases:
+        case['_true_color_class'] = get_diagnosis_color_class(case['true_class'])
+        case['_predicted_color_class'] = get_diagnosis_color_class(case['predicted_class'])
+
+    # Load model card
+    model_card = orjson.loads((BASE_PATH / 'model_card.json').read_bytes())
+
+    # Load performance data, keeping only the sections the UI renders (curves are ~1 MB)
+    performance_data = orjson.loads((BASE_PATH / 'performance_data.json').read_bytes())
+    performance_data = {k: v for k, v in performance_data.items() if k in PERFORMANCE_SECTIONS}
+
+    return curated_cases, model_card, performance_data
+
+
+def load_evaluation_data():
+    """Load all evaluation data files"""
+    try:
+        # A missing file raises before anything is cached, so it is retried next rerun
+        return read_evaluation_data()
     except FileNotFoundError as e:
         st.error(f"Evaluation data file not found: {e}")
         return None, None, None
 
 
-def display_model_card(model_card):
-    """Display model card information in sidebar"""
-    st.sidebar.markdown("### 🏥 Model Information")
-
-    # Model basics
+@st.cache_data(show_spinner=False, max_entries=4)
+def build_model_card_markdown(model_card):
+    """Format the sidebar model card once per distinct model card"""
     model_info = model_card['model_info']
-    st.sidebar.markdown(f"**Model:** {model_info['name']}")
-    st.sidebar.markdown(f"**Architecture:** {model_info['architecture']}")
-
-    # Key performance metrics
-    st.markdown("---")
-    st.sidebar.markdown("### 📊 Key Metrics")
     performance = model_card['performance']
     mi_metrics = performance['mi_clinical_metrics']
+    dataset = model_card['dataset_info']
 
-    col1, col2 = st.sidebar.columns(2)
-    with col1:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{mi_metrics['sensitivity']:.1%}</div>
-            <div class="metric-label">MI Sensitivity</div>
-        </div>
-        """, unsafe_allow_html=True)
-
-    with col2:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{mi_metrics['specificity']:.1%}</div>
-            <div class="metric-label">MI Specificity</div>
-        </div>
-        """, unsafe_allow_html=True)
-
-    col3, col4 = st.sidebar.columns(2)
-    with col3:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{mi_metrics['auc']:.3f}</div>
-            <div class="metric-label">MI AUC</div>
-        </div>
-        """, unsafe_allow_html=True)
+    metrics_html = metric_cards_html([
+        (f"{mi_metrics['sensitivity']:.1%}", "MI Sensitivity"),
+        (f"{mi_metrics['specificity']:.1%}", "MI Specificity"),
+        (f"{mi_metrics['auc']:.3f}", "MI AUC"),
+        (f"{performance['macro_f1']:.3f}", "Macro F1"),
+    ])
+
+    # One markdown block for the model, metrics and dataset sections
+    return "\n\n".join([
+        "### 🏥 Model Information",
+        f"**Model:** {model_info['name']}",
+        f"**Architecture:** {model_info['architecture']}",
+        "---",
+        "### 📊 Key Metrics",
+        metrics_html,
+        "---",
+        "### 📈 Dataset",
+        f"**Dataset:** {dataset['name']} ({dataset['source']})  \n"
+        f"**Cohort:** {dataset['patients']:,} patients | {dataset['total_size']:,} ECG records  \n"
+        f"**Validation/Test:** {dataset['test_size']:,} cases",
+    ])
 
-    with col4:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{performance['macro_f1']:.3f}</div>
-            <div class="metric-label">Macro F1</div>
-        </div>
-        """, unsafe_allow_html=True)
 
-    # Dataset info
-    st.markdown("---")
-    st.sidebar.markdown("### 📈 Dataset")
-    dataset = model_card['dataset_info']
-    st.sidebar.markdown(f"""
-    **Dataset:** {dataset['name']} ({dataset['source']})  
-    **Cohort:** {dataset['patients']:,} patients | {dataset['total_size']:,} ECG records  
-    **Validation/Test:** {dataset['test_size']:,} cases
-    """)
+def display_model_card(model_card):
+    """Display model card information in sidebar"""
+    st.sidebar.markdown(build_model_card_markdown(model_card), unsafe_allow_html=True)
 
     # Clinical notes
     st.markdown("---")
@@ -298,11 +322,45 @@ def display_model_card(model_card):
         """)
 
 
+# Streamlit downsizes wider images on every st.image call; this is its content width cap
+MAX_IMAGE_WIDTH = 1460
+THUMBNAIL_WIDTH = 300
+# Existence checks are cached briefly so reruns skip missing files, yet images added later still appear
+IMAGE_EXISTS_TTL = 60
+
+
+@st.cache_resource(show_spinner=False, max_entries=256)
+def load_scaled_image(img_path, max_width):
+    """Read a static image once per process, pre-scaled to max_width"""
+    image_bytes = Path(img_path).read_bytes()
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        if image.width <= max_width:
+            return image_bytes
+        height = round(image.height * max_width / image.width)
+        buffer = io.BytesIO()
+        image.resize((max_width, height), Image.LANCZOS).save(buffer, format=image.format)
+        return buffer.getvalue()
+
+
+@st.cache_resource(show_spinner=False, max_entries=256, ttl=IMAGE_EXISTS_TTL)
+def image_exists(img_path):
+    """Whether a static image exists, re-checked at most once per IMAGE_EXISTS_TTL seconds"""
+    return Path(img_path).exists()
+
+
+def read_image_bytes(img_path, max_width=MAX_IMAGE_WIDTH):
+    """Cached, pre-scaled image bytes; None if the file does not exist"""
+    if not image_exists(img_path):
+        return None
+    try:
+        return load_scaled_image(img_path, max_width)
+    except FileNotFoundError:
+        return None
+
+
 def display_ecg_image(case_id, view_type="single", overlay_type="clean"):
     """Display ECG image with proper error handling"""
     try:
-        base_path = Path('evaluation_results')
-
         # Determine which image to load
         if overlay_type == "clean":
             # Pre-colored ECG
@@ -323,11 +381,12 @@ def display_ecg_image(case_id, view_type="single", overlay_type="clean"):
             st.warning("Invalid overlay type specified.")
             return
 
-        img_path = base_path / subfolder / filename
+        img_path = f"{IMAGE_DIRS[subfolder]}/{filename}"
 
         # Display image
-        if img_path.exists():
-            st.image(str(img_path), width="stretch")
+        image_bytes = read_image_bytes(img_path)
+        if image_bytes is not None:
+            st.image(image_bytes, width="stretch")
         else:
             st.error(f"ECG image not found: {img_path}")
 
@@ -336,10 +395,7 @@ def display_ecg_image(case_id, view_type="single", overlay_type="clean"):
 
 
 def simulate_prediction_progress():
-    """Simulate AI prediction progress"""
-    progress_text = st.empty()
-    progress_bar = st.progress(0)
-
+    """Show AI prediction progress; predictions are precomputed, so no artificial delay"""
     stages = [
         "Loading 12-lead ECG signal...",
         "Preprocessing cardiac waveforms...",
@@ -349,37 +405,65 @@ def simulate_prediction_progress():
         "Finalizing cardiac diagnosis..."
     ]
 
-    for i, stage in enumerate(stages):
-        progress_text.text(stage)
-        progress_bar.progress((i + 1) / len(stages))
-        time.sleep(0.3)
-
-    progress_text.text("✅ Cardiac analysis complete!")
-    time.sleep(0.5)
-    progress_bar.empty()
-    progress_text.empty()
+    with st.status("Running AI cardiac analysis...", expanded=False) as status:
+        for stage in stages:
+            st.write(stage)
+        status.update(label="✅ Cardiac analysis complete!", state="complete")
+
+
+DIAGNOSIS_COLOR_CLASSES = {
+    'Normal (NORM)': 'diagnosis-norm',
+    'Normal': 'diagnosis-norm',
+    'NORM': 'diagnosis-norm',
+    'Myocardial Infarction (MI)': 'diagnosis-mi',
+    'Myocardial Infarction': 'diagnosis-mi',
+    'MI': 'diagnosis-mi',
+    'ST-T Abnormality (STTC)': 'diagnosis-sttc',
+    'ST-T Abnormality': 'diagnosis-sttc',
+    'STTC': 'diagnosis-sttc',
+    'Conduction Disturbance (CD)': 'diagnosis-cd',
+    'Conduction Disturbance': 'diagnosis-cd',
+    'CD': 'diagnosis-cd',
+    'Hypertrophy (HYP)': 'diagnosis-hyp',
+    'Hypertrophy': 'diagnosis-hyp',
+    'HYP': 'diagnosis-hyp'
+}
 
 
 def get_diagnosis_color_class(diagnosis):
     """Get CSS class for diagnosis color coding"""
-    color_map = {
-        'Normal (NORM)': 'diagnosis-norm',
-        'Normal': 'diagnosis-norm',
-        'NORM': 'diagnosis-norm',
-        'Myocardial Infarction (MI)': 'diagnosis-mi',
-        'Myocardial Infarction': 'diagnosis-mi',
-        'MI': 'diagnosis-mi',
-        'ST-T Abnormality (STTC)': 'diagnosis-sttc',
-        'ST-T Abnormality': 'diagnosis-sttc',
-        'STTC': 'diagnosis-sttc',
-        'Conduction Disturbance (CD)': 'diagnosis-cd',
-        'Conduction Disturbance': 'diagnosis-cd',
-        'CD': 'diagnosis-cd',
-        'Hypertrophy (HYP)': 'diagnosis-hyp',
-        'Hypertrophy': 'diagnosis-hyp',
-        'HYP': 'diagnosis-hyp'
-    }
-    return color_map.get(diagnosis, 'diagnosis-norm')
+    return DIAGNOSIS_COLOR_CLASSES.get(diagnosis, 'diagnosis-norm')
+
+
+DIAGNOSIS_TEXT_COLORS = {
+    'diagnosis-norm': '#00AA00',
+    'diagnosis-mi': '#FF0000',
+    'diagnosis-sttc': '#0066CC',
+    'diagnosis-cd': '#8A2BE2',
+    'diagnosis-hyp': '#FF8C00'
+}
+
+
+DIAGNOSIS_ROW_STYLES = {
+    diagnosis: f'color: {DIAGNOSIS_TEXT_COLORS[color_class]}; font-weight: bold'
+    for diagnosis, color_class in DIAGNOSIS_COLOR_CLASSES.items()
+}
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def build_differential_table(case_id, _predictions):
+    """Differential diagnosis table HTML for a case, sorted by probability, built once per case_id"""
+    ranked = sorted(_predictions.items(), key=lambda item: item[1], reverse=True)
+    rows = "".join(
+        f'<tr style="{DIAGNOSIS_ROW_STYLES.get(diagnosis, DIAGNOSIS_ROW_STYLES["NORM"])}">'
+        f'<td>{diagnosis}</td><td>{probability:.1%}</td></tr>'
+        for diagnosis, probability in ranked
+    )
+    return (
+        '<table class="differential-table">'
+        '<thead><tr><th>Diagnosis</th><th>Probability</th></tr></thead>'
+        f'<tbody>{rows}</tbody></table>'
+    )
 
 
 def display_prediction_results(case_data, show_differential=True):
@@ -388,7 +472,7 @@ def display_prediction_results(case_data, show_differential=True):
     # Primary diagnosis
     predicted_class = case_data['predicted_class']
     confidence = case_data['confidence']
-    color_class = get_diagnosis_color_class(predicted_class)
+    color_class = case_data['_predicted_color_class']
 
     st.markdown(f"""
     <div style="text-align: center; padding: 1rem;">
@@ -402,36 +486,17 @@ def display_prediction_results(case_data, show_differential=True):
         # Differential diagnosis table
         st.markdown("### Differential Diagnosis")
 
-        predictions_df = pd.DataFrame([
-            {'Diagnosis': diag, 'Probability': prob}
-            for diag, prob in case_data['predictions'].items()
-        ]).sort_values('Probability', ascending=False)
-
-        # Color-code the dataframe
-        def style_diagnosis(row):
-            color_class = get_diagnosis_color_class(row['Diagnosis'])
-            color_map = {
-                'diagnosis-norm': '#00AA00',
-                'diagnosis-mi': '#FF0000',
-                'diagnosis-sttc': '#0066CC',
-                'diagnosis-cd': '#8A2BE2',
-                'diagnosis-hyp': '#FF8C00'
-            }
-            color = color_map.get(color_class, '#000000')
-            return [f'color: {color}; font-weight: bold'] * len(row)
-
-        styled_df = predictions_df.style.apply(style_diagnosis, axis=1)
-        st.dataframe(styled_df, width="stretch")
+        # Rows are color-coded by diagnosis
+        st.markdown(build_differential_table(case_data['case_id'], case_data['predictions']),
+                    unsafe_allow_html=True)
 
 
 def display_shap_analysis(case_id):
     """Display SHAP analysis for the selected case"""
     try:
-        base_path = Path('evaluation_results')
-        shap_path = base_path / 'curated_cases' / f'case_{case_id}_shap.png'
-
-        if shap_path.exists():
-            st.image(str(shap_path), width="stretch")
+        shap_bytes = read_image_bytes(f"{IMAGE_DIRS['curated_cases']}/case_{case_id}_shap.png")
+        if shap_bytes is not None:
+            st.image(shap_bytes, width="stretch")
         else:
             st.warning("SHAP analysis not available for this case")
 
@@ -460,8 +525,6 @@ def display_clinical_note(case_data):
 
 def display_performance_plots():
     """Display all performance analysis plots"""
-    base_path = Path('evaluation_results')
-
     # Performance plots
     plots = [
         ('calibration_curves.png', 'Model Calibration Analysis'),
@@ -470,10 +533,10 @@ def display_performance_plots():
     ]
 
     for plot_file, title in plots:
-        plot_path = base_path / plot_file
-        if plot_path.exists():
+        plot_bytes = read_image_bytes(f"{IMAGE_DIRS['base']}/{plot_file}")
+        if plot_bytes is not None:
             st.markdown(f"#### {title}")
-            st.image(str(plot_path), width="stretch")
+            st.image(plot_bytes, width="stretch")
 
             # --- Calibration explanation ---
             if "calibration" in plot_file:
@@ -516,15 +579,11 @@ Comparable accuracy in males, females, and older adults highlights strong genera
             st.warning(f"Plot not found: {title}")
 
 
-def create_case_explorer_grid(curated_cases):
-    """Create grid view of all curated cases"""
-    st.markdown("Overview of all 7 curated cases with ground truth vs predictions")
-
-    # Create grid layout
-    st.markdown('<div class="case-grid">', unsafe_allow_html=True)
-
-    for case in curated_cases:
-        # Case card
+@st.cache_resource(show_spinner=False)
+def build_case_card_html(_curated_cases):
+    """Format every case explorer card once; curated cases are loaded once per process"""
+    cards = []
+    for case in _curated_cases:
         true_class = case['true_class']
         predicted_class = case['predicted_class']
         confidence = case['confidence']
@@ -533,21 +592,34 @@ def create_case_explorer_grid(curated_cases):
         is_correct = true_class == predicted_class
         border_color = "#00AA00" if is_correct else "#FF0000"
 
-        st.markdown(f"""
+        cards.append(f"""
         <div style="border: 2px solid {border_color}; border-radius: 10px; padding: 1rem; margin: 0.5rem 0;">
             <h5>Case {case['case_id']}: {case['description']}</h5>
-            <p><strong>True:</strong> <span class="{get_diagnosis_color_class(true_class)}">{true_class}</span></p>
-            <p><strong>Predicted:</strong> <span class="{get_diagnosis_color_class(predicted_class)}">{predicted_class}</span> ({confidence:.1%})</p>
+            <p><strong>True:</strong> <span class="{case['_true_color_class']}">{true_class}</span></p>
+            <p><strong>Predicted:</strong> <span class="{case['_predicted_color_class']}">{predicted_class}</span> ({confidence:.1%})</p>
             <p><strong>Status:</strong> {'✅ Correct' if is_correct else '❌ Incorrect'}</p>
         </div>
-        """, unsafe_allow_html=True)
+        """)
+    return cards
+
+
+def create_case_explorer_grid(curated_cases):
+    """Create grid view of all curated cases"""
+    st.markdown("Overview of all 7 curated cases with ground truth vs predictions")
+
+    # Create grid layout
+    st.markdown('<div class="case-grid">', unsafe_allow_html=True)
+
+    for case, card_html in zip(curated_cases, build_case_card_html(curated_cases)):
+        # Case card
+        st.markdown(card_html, unsafe_allow_html=True)
 
         # Thumbnail ECG
         try:
-            base_path = Path('evaluation_results')
-            thumbnail_path = base_path / 'precolored_ecgs' / f'case_{case["case_id"]}_ecg_single_clean.png'
-            if thumbnail_path.exists():
-                st.image(str(thumbnail_path), width=300)
+            thumbnail_path = f"{IMAGE_DIRS['precolored_ecgs']}/case_{case['case_id']}_ecg_single_clean.png"
+            thumbnail_bytes = read_image_bytes(thumbnail_path, THUMBNAIL_WIDTH)
+            if thumbnail_bytes is not None:
+                st.image(thumbnail_bytes, width=THUMBNAIL_WIDTH)
         except Exception:
             st.write("Thumbnail not available")
 
@@ -568,16 +640,21 @@ def get_case_summary(case_data):
     }
 
 
+def agreement_table_markdown(condition_label, conditions, agreement):
+    """Markdown table of prediction agreement per test condition"""
+    rows = "\n".join(f"| {condition} | {score} |" for condition, score in zip(conditions, agreement))
+    return f"| {condition_label} | Agreement |\n|---|---|\n{rows}"
+
+
 def display_robustness_results(performance_data):
     """Display robustness testing results"""
     st.markdown("Testing model stability under various signal conditions")
 
     # Display robustness plots
-    base_path = Path('evaluation_results')
-    robustness_plot = base_path / 'robustness_test.png'
+    robustness_bytes = read_image_bytes(f"{IMAGE_DIRS['base']}/robustness_test.png")
 
-    if robustness_plot.exists():
-        st.image(str(robustness_plot), width="stretch")
+    if robustness_bytes is not None:
+        st.image(robustness_bytes, width="stretch")
 
     # Display robustness metrics if available
     if 'robustness' in performance_data:
@@ -588,20 +665,16 @@ def display_robustness_results(performance_data):
         with col1:
             st.markdown("#### Amplitude Jitter Test")
             if 'jitter_performance' in robustness:
-                jitter_data = pd.DataFrame({
-                    'Noise Level': robustness['jitter_levels'],
-                    'Agreement': robustness['jitter_performance']
-                })
-                st.dataframe(jitter_data, width="stretch")
+                st.markdown(agreement_table_markdown(
+                    'Noise Level', robustness['jitter_levels'], robustness['jitter_performance']
+                ))
 
         with col2:
             st.markdown("#### Amplitude Scaling Test")
             if 'scale_performance' in robustness:
-                scale_data = pd.DataFrame({
-                    'Scale Factor': robustness['scale_factors'],
-                    'Agreement': robustness['scale_performance']
-                })
-                st.dataframe(scale_data, width="stretch")
+                st.markdown(agreement_table_markdown(
+                    'Scale Factor', robustness['scale_factors'], robustness['scale_performance']
+                ))
 
         st.markdown("")
         st.markdown("""